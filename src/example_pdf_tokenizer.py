@@ -7,7 +7,190 @@ This module shows basic usage examples for the PDF Tokenizer library.
 import os
 import time
 import argparse
-from typing import Dict, List, Optional
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional, Set
+
+MB = 1024 * 1024
+
+
+class MemoryGovernor:
+    """
+    Resource governor that keeps tokenization within a memory budget.
+    
+    Tracks RSS per worker process and per processing stage. When usage
+    approaches the budget it shrinks the batch size, and when the budget
+    is exceeded it pauses new page dispatch while other workers can still
+    release memory. Workers whose post-batch RSS floor keeps rising past
+    their baseline are flagged for recycling.
+    
+    Requires psutil, which is imported only when a governor is created.
+    """
+    
+    def __init__(self,
+                 budget_mb: float,
+                 soft_limit: float = 0.8,
+                 ratchet_mb: float = 256,
+                 ratchet_window: int = 3,
+                 pause_interval: float = 0.5,
+                 max_pause: float = 30.0,
+                 max_events: int = 1000):
+        """
+        Initialize the memory governor.
+        
+        Args:
+            budget_mb: Total RSS budget in MB for the tokenizer and its workers
+            soft_limit: Fraction of the budget at which batches start shrinking
+            ratchet_mb: Growth of a worker's RSS floor over its baseline that
+                triggers recycling
+            ratchet_window: Number of post-batch samples the RSS floor is taken over
+            pause_interval: Seconds to wait between checks while dispatch is paused
+            max_pause: Maximum seconds to pause before dispatching anyway
+            max_events: Number of most recent throttling events to keep
+        """
+        if budget_mb <= 0:
+            raise ValueError(f"Memory budget must be positive: {budget_mb}")
+        if not 0 < soft_limit <= 1:
+            raise ValueError(f"Soft limit must be in (0, 1]: {soft_limit}")
+        if ratchet_window < 1:
+            raise ValueError(f"Ratchet window must be at least 1: {ratchet_window}")
+            
+        import psutil
+        self._psutil = psutil
+        
+        self.budget_mb = budget_mb
+        self.soft_limit = soft_limit
+        self.ratchet_mb = ratchet_mb
+        self.ratchet_window = ratchet_window
+        self.pause_interval = pause_interval
+        self.max_pause = max_pause
+        
+        self._workers: Dict[int, "psutil.Process"] = {}
+        self._baseline_mb: Dict[int, float] = {}
+        self._post_batch_mb: Dict[int, Deque[float]] = {}
+        self._recycled: Set[int] = set()
+        self.worker_peak_mb: Dict[int, float] = {}
+        self.stage_peak_mb: Dict[str, float] = {}
+        self.events: Deque[Dict] = deque(maxlen=max_events)
+        self.event_counts: Dict[str, int] = {}
+        
+        self.register_worker(os.getpid())
+        
+    def register_worker(self, pid: int) -> None:
+        """Start tracking RSS for a worker process."""
+        process = self._psutil.Process(pid)
+        self._workers[pid] = process
+        self._baseline_mb[pid] = process.memory_info().rss / MB
+        self._post_batch_mb[pid] = deque(maxlen=self.ratchet_window)
+        self._recycled.discard(pid)
+        self.worker_peak_mb[pid] = self._baseline_mb[pid]
+        
+    def unregister_worker(self, pid: int) -> None:
+        """Stop tracking a worker process (e.g. after it exits)."""
+        self._workers.pop(pid, None)
+        self._baseline_mb.pop(pid, None)
+        self._post_batch_mb.pop(pid, None)
+        self._recycled.discard(pid)
+        
+    def worker_rss_mb(self, pid: int) -> float:
+        """Return the current RSS of a worker in MB, updating its peak."""
+        try:
+            rss = self._workers[pid].memory_info().rss / MB
+        except self._psutil.NoSuchProcess:
+            self.unregister_worker(pid)
+            return 0.0
+        self.worker_peak_mb[pid] = max(self.worker_peak_mb.get(pid, 0.0), rss)
+        return rss
+        
+    def total_rss_mb(self) -> float:
+        """Return the combined RSS of all tracked workers in MB."""
+        return sum(self.worker_rss_mb(pid) for pid in list(self._workers))
+        
+    @contextmanager
+    def track(self, stage: str) -> Iterator[None]:
+        """Record the highest RSS sampled at the start and end of a stage."""
+        rss = self.total_rss_mb()
+        try:
+            yield
+        finally:
+            rss = max(rss, self.total_rss_mb())
+            self.stage_peak_mb[stage] = max(self.stage_peak_mb.get(stage, 0.0), rss)
+            
+    def admit_batch(self, batch_size: int) -> int:
+        """
+        Decide how many pages may be dispatched next.
+        
+        Dispatch only pauses when other workers are tracked, since the
+        calling process cannot release memory while it waits.
+        
+        Args:
+            batch_size: Requested number of pages
+            
+        Returns:
+            Number of pages to dispatch, never less than 1
+        """
+        batch_size = max(1, batch_size)
+        rss = self.total_rss_mb()
+        if rss >= self.budget_mb and len(self._workers) > 1:
+            self._record('pause', rss_mb=rss)
+            waited = 0.0
+            while rss >= self.budget_mb and waited < self.max_pause:
+                time.sleep(self.pause_interval)
+                waited += self.pause_interval
+                rss = self.total_rss_mb()
+            if rss >= self.budget_mb:
+                self._record('pause_timeout', rss_mb=rss, waited=waited)
+                
+        if rss < self.budget_mb * self.soft_limit:
+            return batch_size
+            
+        # Scale the batch down with the remaining headroom
+        headroom = max(self.budget_mb - rss, 0.0) / (self.budget_mb * (1 - self.soft_limit) or 1)
+        admitted = max(1, min(batch_size, int(batch_size * headroom)))
+        if admitted < batch_size:
+            self._record('shrink_batch', rss_mb=rss, batch_size=admitted)
+        return admitted
+        
+    def workers_to_recycle(self) -> List[int]:
+        """
+        Sample post-batch RSS and return workers that newly need recycling.
+        
+        A worker ratchets when the lowest RSS over its last
+        ``ratchet_window`` post-batch samples exceeds its baseline by more
+        than ``ratchet_mb``. Each worker is reported once until it is
+        registered again.
+        """
+        recycle = []
+        for pid in list(self._workers):
+            rss = self.worker_rss_mb(pid)
+            if pid not in self._workers:
+                continue
+            samples = self._post_batch_mb[pid]
+            samples.append(rss)
+            if pid in self._recycled or len(samples) < self.ratchet_window:
+                continue
+            floor = min(samples)
+            if floor - self._baseline_mb[pid] > self.ratchet_mb:
+                self._recycled.add(pid)
+                self._record('recycle', pid=pid, rss_mb=rss, floor_mb=floor)
+                recycle.append(pid)
+        return recycle
+        
+    def get_stats(self) -> Dict:
+        """Return the budget, peak usage and throttling events."""
+        return {
+            "budget_mb": self.budget_mb,
+            "soft_limit_mb": self.budget_mb * self.soft_limit,
+            "worker_peak_mb": dict(self.worker_peak_mb),
+            "stage_peak_mb": dict(self.stage_peak_mb),
+            "event_counts": dict(self.event_counts),
+            "events": list(self.events),
+        }
+        
+    def _record(self, event: str, **details) -> None:
+        """Append a throttling event."""
+        self.event_counts[event] = self.event_counts.get(event, 0) + 1
+        self.events.append({"event": event, "time": time.time(), **details})
 
 
 class PDFTokenizer:
@@ -25,7 +208,8 @@ class PDFTokenizer:
                  ocr_language: str = 'eng',
                  max_length: Optional[int] = None,
                  stride: Optional[int] = None,
-                 cache_enabled: bool = True):
+                 cache_enabled: bool = True,
+                 memory_budget_mb: Optional[float] = None):
         """
         Initialize the PDF tokenizer with specified options.
         
@@ -37,7 +221,11 @@ class PDFTokenizer:
             max_length: Maximum length of token sequences (for ML strategy)
             stride: Stride for overlapping tokens (for ML strategy)
             cache_enabled: Whether to cache results
+            memory_budget_mb: RSS budget in MB; enables the memory governor
         """
+        if batch_size < 1:
+            raise ValueError(f"Batch size must be at least 1: {batch_size}")
+            
         self.strategy = strategy
         self.batch_size = batch_size
         self.use_ocr = use_ocr
@@ -45,6 +233,9 @@ class PDFTokenizer:
         self.max_length = max_length
         self.stride = stride
         self.cache_enabled = cache_enabled
+        self.governor = (MemoryGovernor(memory_budget_mb)
+                         if memory_budget_mb is not None else None)
+        self.pages_processed = 0
         
         # This would actually initialize real tokenization backend
         print(f"Initialized PDF Tokenizer with strategy: {strategy}")
@@ -69,8 +260,23 @@ class PDFTokenizer:
             
         print(f"Tokenizing '{pdf_path}' with strategy: {self.strategy}")
         
-        # Simulate processing time
-        time.sleep(1)
+        page_queue = list(pages) if pages else [1]
+        if not self.governor:
+            # Simulate processing time
+            time.sleep(1)
+            self.pages_processed += len(page_queue)
+        else:
+            stage = 'ocr' if self.use_ocr else 'extract'
+            total_pages = len(page_queue)
+            while page_queue:
+                batch_size = self.governor.admit_batch(self.batch_size)
+                batch, page_queue = page_queue[:batch_size], page_queue[batch_size:]
+                with self.governor.track(stage):
+                    # Simulate processing time, spread across batches
+                    time.sleep(len(batch) / total_pages)
+                # A worker pool would restart these; the demo runs in-process
+                self.governor.workers_to_recycle()
+                self.pages_processed += len(batch)
         
         # This would actually return real tokens from the PDF
         return [
@@ -78,6 +284,15 @@ class PDFTokenizer:
             {"text": "PDF", "page": 1, "bbox": [155, 100, 180, 120]},
             {"text": "tokenization", "page": 1, "bbox": [185, 100, 250, 120]},
         ]
+        
+    def get_stats(self) -> Dict:
+        """Return processing statistics, including memory governor state."""
+        return {
+            "strategy": self.strategy,
+            "batch_size": self.batch_size,
+            "pages_processed": self.pages_processed,
+            "memory": self.governor.get_stats() if self.governor else None,
+        }
 
 
 class TextClassifier:
@@ -125,6 +340,8 @@ def parse_arguments():
                         help='Classify the document')
     parser.add_argument('--entities', action='store_true',
                         help='Extract named entities')
+    parser.add_argument('--memory-budget', type=float, default=None,
+                        help='Memory budget in MB for throttling workers')
     
     return parser.parse_args()
 
@@ -136,7 +353,8 @@ def main():
     # Initialize tokenizer
     tokenizer = PDFTokenizer(
         strategy=args.strategy,
-        use_ocr=args.ocr
+        use_ocr=args.ocr,
+        memory_budget_mb=args.memory_budget
     )
     
     # Tokenize the document
@@ -144,6 +362,11 @@ def main():
         tokens = tokenizer.tokenize(args.pdf)
         print(f"Extracted {len(tokens)} tokens")
         
+        if tokenizer.governor:
+            memory = tokenizer.get_stats()["memory"]
+            print(f"Memory budget: {memory['budget_mb']} MB, "
+                  f"throttling events: {memory['event_counts']}")
+        
         # Optional classification
         if args.classify:
             classifier = TextClassifier()
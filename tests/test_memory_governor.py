@@ -0,0 +1,164 @@
+"""Tests for the memory governor in the example PDF tokenizer."""
+
+import os
+import sys
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import example_pdf_tokenizer as ept  # noqa: E402
+
+MB = ept.MB
+
+
+class FakePsutil:
+    """Stand-in psutil module whose per-process RSS is set by the test."""
+
+    class NoSuchProcess(Exception):
+        pass
+
+    def __init__(self):
+        self.rss_mb = {}
+        self.module = types.ModuleType('psutil')
+        self.module.NoSuchProcess = self.NoSuchProcess
+        self.module.Process = self.process
+
+    def process(self, pid):
+        process = mock.Mock()
+        process.memory_info.side_effect = (
+            lambda: types.SimpleNamespace(rss=self.rss_mb.get(pid, 0) * MB))
+        return process
+
+
+class MemoryGovernorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.psutil = FakePsutil()
+        self.pid = os.getpid()
+        self.psutil.rss_mb[self.pid] = 100
+        patches = [
+            mock.patch.dict(sys.modules, {'psutil': self.psutil.module}),
+            mock.patch.object(ept.time, 'sleep'),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.sleep = ept.time.sleep
+
+    def make_governor(self, **kwargs):
+        kwargs.setdefault('budget_mb', 1000)
+        return ept.MemoryGovernor(**kwargs)
+
+    def set_rss(self, rss_mb, pid=None):
+        self.psutil.rss_mb[self.pid if pid is None else pid] = rss_mb
+
+
+class TestAdmitBatch(MemoryGovernorTestCase):
+
+    def test_below_soft_limit_admits_full_batch(self):
+        governor = self.make_governor()
+        self.set_rss(500)
+        self.assertEqual(governor.admit_batch(10), 10)
+        self.assertEqual(governor.event_counts, {})
+
+    def test_between_soft_limit_and_budget_scales_with_headroom(self):
+        governor = self.make_governor()
+        self.set_rss(900)  # halfway between the 800 MB soft limit and budget
+        self.assertEqual(governor.admit_batch(10), 5)
+        self.assertEqual(governor.event_counts, {'shrink_batch': 1})
+
+    def test_over_budget_single_worker_dispatches_one_page_without_pausing(self):
+        governor = self.make_governor()
+        self.set_rss(1200)
+        self.assertEqual(governor.admit_batch(10), 1)
+        self.sleep.assert_not_called()
+        self.assertNotIn('pause', governor.event_counts)
+
+    def test_soft_limit_of_one_does_not_divide_by_zero(self):
+        governor = self.make_governor(soft_limit=1)
+        self.set_rss(999)
+        self.assertEqual(governor.admit_batch(10), 10)
+        self.set_rss(1000)
+        self.assertEqual(governor.admit_batch(10), 1)
+
+    def test_pauses_until_other_worker_releases_memory(self):
+        governor = self.make_governor()
+        self.set_rss(600)
+        self.set_rss(600, pid=4242)
+        governor.register_worker(4242)
+        self.sleep.side_effect = lambda _: self.set_rss(100, pid=4242)
+        self.assertEqual(governor.admit_batch(10), 10)
+        self.assertEqual(self.sleep.call_count, 1)
+        self.assertEqual(governor.event_counts, {'pause': 1})
+
+    def test_pause_times_out(self):
+        governor = self.make_governor(pause_interval=0.5, max_pause=2.0)
+        self.set_rss(600)
+        self.set_rss(600, pid=4242)
+        governor.register_worker(4242)
+        self.assertEqual(governor.admit_batch(10), 1)
+        self.assertEqual(self.sleep.call_count, 4)
+        self.assertEqual(governor.event_counts,
+                         {'pause': 1, 'pause_timeout': 1, 'shrink_batch': 1})
+
+
+class TestWorkersToRecycle(MemoryGovernorTestCase):
+
+    def test_ratcheting_worker_is_reported_once(self):
+        governor = self.make_governor(ratchet_mb=256, ratchet_window=3)
+        self.set_rss(500)
+        reported = [governor.workers_to_recycle() for _ in range(5)]
+        self.assertEqual(reported, [[], [], [self.pid], [], []])
+        self.assertEqual(governor.event_counts, {'recycle': 1})
+
+    def test_transient_peak_is_not_a_ratchet(self):
+        governor = self.make_governor(ratchet_mb=256, ratchet_window=3)
+        for rss in (825, 825, 120, 825, 825):
+            self.set_rss(rss)
+            self.assertEqual(governor.workers_to_recycle(), [])
+
+    def test_reregistering_resets_worker(self):
+        governor = self.make_governor(ratchet_window=1)
+        self.set_rss(500)
+        self.assertEqual(governor.workers_to_recycle(), [self.pid])
+        self.set_rss(100)
+        governor.register_worker(self.pid)
+        self.set_rss(500)
+        self.assertEqual(governor.workers_to_recycle(), [self.pid])
+
+    def test_events_are_capped(self):
+        governor = self.make_governor(max_events=2)
+        self.set_rss(900)
+        for _ in range(5):
+            governor.admit_batch(10)
+        self.assertEqual(len(governor.get_stats()['events']), 2)
+        self.assertEqual(governor.event_counts, {'shrink_batch': 5})
+
+
+class TestTokenizerStats(MemoryGovernorTestCase):
+
+    def test_stats_include_budget_and_event_counts(self):
+        tokenizer = ept.PDFTokenizer(batch_size=4, memory_budget_mb=1000)
+        self.set_rss(900)
+        tokenizer.tokenize(__file__, pages=list(range(1, 5)))
+
+        stats = tokenizer.get_stats()
+        self.assertEqual(stats['pages_processed'], 4)
+        self.assertEqual(stats['memory']['budget_mb'], 1000)
+        self.assertEqual(stats['memory']['event_counts'], {'shrink_batch': 2})
+        self.assertEqual(stats['memory']['stage_peak_mb'], {'extract': 900})
+
+    def test_invalid_budget_is_rejected(self):
+        for budget in (0, -1):
+            with self.assertRaises(ValueError):
+                ept.PDFTokenizer(memory_budget_mb=budget)
+
+    def test_invalid_batch_size_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ept.PDFTokenizer(batch_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()